@@ -1,48 +1,76 @@
 import boto3
+from botocore.config import Config
 from datetime import datetime
 
-cloudwatch = boto3.client('cloudwatch')
-
-response = cloudwatch.get_metric_data(
-    MetricDataQueries=[
-        {
-            'Id': 'input_tokens',
-            'MetricStat': {
-                'Metric': {
-                    'Namespace': 'AWS/Bedrock',
-                    'MetricName': 'InputTokenCount',
-                    'Dimensions': [
-                        {
-                            'Name': 'ModelId',
-                            'Value': 'us.meta.llama4-maverick-17b-instruct-v1:0'
-                        }
-                    ]
-                },
-                'Period': 3600,
-                'Stat': 'Sum'
-            }
-        },
-        {
-            'Id': 'output_tokens',
-            'MetricStat': {
-                'Metric': {
-                    'Namespace': 'AWS/Bedrock',
-                    'MetricName': 'OutputTokenCount',
-                    'Dimensions': [
-                        {
-                            'Name': 'ModelId',
-                            'Value': 'us.meta.llama4-maverick-17b-instruct-v1:0'
-                        }
-                    ]
-                },
-                'Period': 3600,
-                'Stat': 'Sum'
-            }
-        }
-    ],
-    StartTime=datetime(2025, 10, 1),
-    EndTime=datetime(2025, 10, 13)
+cloudwatch = boto3.client(
+    'cloudwatch',
+    config=Config(
+        retries={'mode': 'adaptive', 'max_attempts': 5},
+        connect_timeout=5,
+        read_timeout=30
+    )
 )
 
-for result in response['MetricDataResults']:
-    print(f"{result['Label']}: {sum(result['Values'])}")
+metric_queries = [
+    {
+        'Id': 'input_tokens',
+        'MetricStat': {
+            'Metric': {
+                'Namespace': 'AWS/Bedrock',
+                'MetricName': 'InputTokenCount',
+                'Dimensions': [
+                    {
+                        'Name': 'ModelId',
+                        'Value': 'us.meta.llama4-maverick-17b-instruct-v1:0'
+                    }
+                ]
+            },
+            'Period': 3600,
+            'Stat': 'Sum'
+        }
+    },
+    {
+        'Id': 'output_tokens',
+        'MetricStat': {
+            'Metric': {
+                'Namespace': 'AWS/Bedrock',
+                'MetricName': 'OutputTokenCount',
+                'Dimensions': [
+                    {
+                        'Name': 'ModelId',
+                        'Value': 'us.meta.llama4-maverick-17b-instruct-v1:0'
+                    }
+                ]
+            },
+            'Period': 3600,
+            'Stat': 'Sum'
+        }
+    }
+]
+
+# Follow NextToken so long time ranges don't silently truncate results
+totals = {}
+labels = {}
+next_token = None
+
+while True:
+    kwargs = {
+        'MetricDataQueries': metric_queries,
+        'StartTime': datetime(2025, 10, 1),
+        'EndTime': datetime(2025, 10, 13)
+    }
+    if next_token:
+        kwargs['NextToken'] = next_token
+
+    response = cloudwatch.get_metric_data(**kwargs)
+
+    for result in response['MetricDataResults']:
+        totals[result['Id']] = totals.get(result['Id'], 0) + sum(result['Values'])
+        labels[result['Id']] = result['Label']
+
+    next_token = response.get('NextToken')
+    if not next_token:
+        break
+
+for metric_id, total in totals.items():
+    print(f"{labels[metric_id]}: {total}")
@@ -1,6 +1,6 @@
 # debug_specific_quiz.py
 from src.canvas.client import CanvasClient
-import json
+import orjson
 
 client = CanvasClient()
 course_id = "80546"  # CS 555
@@ -9,7 +9,7 @@ assignment_id = "615240"  # Quiz 02
 print("=== DIRECT ASSIGNMENT FETCH ===")
 try:
     assignment = client._make_request(f"courses/{course_id}/assignments/{assignment_id}")
-    print(json.dumps(assignment, indent=2))
+    print(orjson.dumps(assignment, option=orjson.OPT_INDENT_2).decode())
 except Exception as e:
     print(f"Error: {e}")
 
@@ -26,7 +26,7 @@ try:
     quiz_assignments = [a for a in assignments if "615240" in str(a.get("id"))]
     if quiz_assignments:
         print("Found Quiz 02!")
-        print(json.dumps(quiz_assignments[0], indent=2))
+        print(orjson.dumps(quiz_assignments[0], option=orjson.OPT_INDENT_2).decode())
     else:
         print("Quiz 02 not in the list")
         print("Assignment IDs returned:", [a["id"] for a in assignments[:15]])
@@ -1,6 +1,9 @@
 # src/agent/canvas_agent.py
+import functools
+import logging
 import os
 import time
+from botocore.config import Config
 from dotenv import load_dotenv
 from langchain_aws import ChatBedrockConverse
 from langchain_mcp_adapters.tools import load_mcp_tools
@@ -12,6 +15,42 @@ from src.utils.token_tracker import TokenTracker
 
 load_dotenv()
 
+log = logging.getLogger(__name__)
+if os.getenv("CANVAS_AGENT_DEBUG"):
+    # Nothing else in the app configures logging, and Python's
+    # last-resort handler drops records below WARNING - so the flag
+    # has to attach a handler for the debug output to appear
+    logging.basicConfig(level=logging.DEBUG)
+    log.setLevel(logging.DEBUG)
+else:
+    log.setLevel(logging.WARNING)
+
+
+@functools.lru_cache(maxsize=4)
+def _make_llm(model_id: str, region: str) -> ChatBedrockConverse:
+    """Build (and cache) a Bedrock LLM client for a model/region pair
+
+    Sharing one client across agent instances reuses the botocore
+    connection pool instead of re-doing TLS handshakes per session.
+    """
+    kwargs = {}
+    if os.getenv("BEDROCK_LATENCY_OPT"):
+        # Opt-in: not every model supports latency-optimized inference
+        kwargs["performance_config"] = {"latency": "optimized"}
+
+    return ChatBedrockConverse(
+        model=f"us.{model_id}",
+        region_name=region,
+        temperature=0.3,
+        max_tokens=4096,
+        **kwargs,
+        config=Config(
+            retries={"mode": "adaptive"},
+            tcp_keepalive=True,
+            max_pool_connections=32,
+        ),
+    )
+
 
 class CanvasAgent:
     """Agent that uses Canvas MCP tools with Bedrock LLM"""
@@ -29,16 +68,11 @@ class CanvasAgent:
     async def initialize(self):
         """Initialize the agent with MCP tools and Bedrock LLM"""
 
-        print("🤖 Initializing Canvas Agent...")
+        log.debug("Initializing Canvas Agent...")
 
-        # 1. Create Bedrock LLM
-        print("   ↳ Connecting to Bedrock...")
-        self.llm = ChatBedrockConverse(
-            model=f"us.{self.model_id}",
-            region_name=self.region,
-            temperature=0.3,
-            max_tokens=4096,
-        )
+        # 1. Create Bedrock LLM (cached across agent instances)
+        log.debug("Connecting to Bedrock...")
+        self.llm = _make_llm(self.model_id, self.region)
 
         # 2. Set up MCP server parameters
         self.server_params = StdioServerParameters(
@@ -46,7 +80,7 @@ class CanvasAgent:
         )
 
         # 3. Connect to Canvas MCP server and load tools
-        print("   ↳ Connecting to Canvas MCP server...")
+        log.debug("Connecting to Canvas MCP server...")
         self.stdio_context = stdio_client(self.server_params)
         read, write = await self.stdio_context.__aenter__()
 
@@ -55,12 +89,12 @@ class CanvasAgent:
         await self.session.initialize()
 
         # 4. Load MCP tools
-        print("   ↳ Loading Canvas tools...")
+        log.debug("Loading Canvas tools...")
         tools = await load_mcp_tools(self.session)
-        print(f"   ↳ Loaded {len(tools)} tools")
+        log.debug("Loaded %d tools", len(tools))
 
         # 5. Create ReAct agent
-        print("   ↳ Creating agent...")
+        log.debug("Creating agent...")
         self.agent = create_react_agent(
             self.llm,
             tools,
@@ -85,7 +119,7 @@ class CanvasAgent:
             """,
         )
 
-        print("✅ Agent ready!\n")
+        log.debug("Agent ready")
 
     async def query(self, user_input: str) -> str:
         """
@@ -100,8 +134,8 @@ class CanvasAgent:
         if not self.agent:
             raise ValueError("Agent not initialized. Call initialize() first.")
         
-        # Track start time
-        start_time = time.time()
+        # Track start time (monotonic; immune to wall-clock jumps)
+        start_time = time.perf_counter()
         
         # Run agent
         result = await self.agent.ainvoke(
@@ -109,26 +143,24 @@ class CanvasAgent:
         )
         
         # Calculate response time
-        response_time = time.time() - start_time
+        response_time = time.perf_counter() - start_time
         
         # Extract response (last message)
         response = result["messages"][-1].content
         
-        # Sum up token usage from all AI messages
+        # Sum token usage and detect tool use in a single pass
         total_input_tokens = 0
         total_output_tokens = 0
-        
+        tools_used = False
+
         for msg in result["messages"]:
-            if hasattr(msg, 'usage_metadata') and msg.usage_metadata:
-                total_input_tokens += msg.usage_metadata.get("input_tokens", 0)
-                total_output_tokens += msg.usage_metadata.get("output_tokens", 0)
-        
-        # Check if tools were used
-        tools_used = any(
-            hasattr(msg, 'tool_calls') and msg.tool_calls
-            for msg in result["messages"]
-        )
-        
+            usage = getattr(msg, 'usage_metadata', None)
+            if usage:
+                total_input_tokens += usage.get("input_tokens", 0)
+                total_output_tokens += usage.get("output_tokens", 0)
+            if getattr(msg, 'tool_calls', None):
+                tools_used = True
+
         # Log token usage
         log_entry = self.tracker.log_usage(
             model_id=self.model_id,
@@ -140,8 +172,14 @@ class CanvasAgent:
             session_id=self.session_id
         )
         
-        # Print cost info
-        print(f"💰 Tokens: {log_entry['total_tokens']} | Cost: ${log_entry['estimated_cost_usd']:.6f} | Time: {log_entry['response_time_sec']}s")
+        # Log cost info (lazy %-formatting so the string isn't built
+        # when the level is disabled)
+        log.debug(
+            "Tokens: %s | Cost: $%.6f | Time: %ss",
+            log_entry['total_tokens'],
+            log_entry['estimated_cost_usd'],
+            log_entry['response_time_sec']
+        )
         
         return response
 
@@ -149,6 +187,7 @@ class CanvasAgent:
 
     async def cleanup(self):
         """Clean up resources"""
+        self.tracker.flush()
         if self.session:
             await self.session.__aexit__(None, None, None)
         if self.stdio_context:
@@ -1,11 +1,168 @@
+import re
+
+import orjson
 import requests
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime, timedelta, timezone
 import os
+import time
 from dotenv import load_dotenv
-from datetime import datetime, timezone
 
-load_dotenv()
+# Skip the .env read when the environment is already populated (e.g. when
+# another module loaded it first)
+if not os.getenv("CANVAS_URL"):
+    load_dotenv()
+
+
+class CanvasAPIError(Exception):
+    """Raised when a Canvas API request fails"""
+
+
+class Unauthorized(CanvasAPIError):
+    """Canvas rejected the access token (401)"""
+
+
+class Forbidden(CanvasAPIError):
+    """The token lacks permission for this resource (403)"""
+
+
+class NotFound(CanvasAPIError):
+    """The requested Canvas resource does not exist (404)"""
+
+
+# Shared read-only default for optional nested dicts, so projections
+# don't allocate a throwaway {} per .get() chain
+_EMPTY = {}
+
+
+# Field schemas for flat projections: (output key, source key, default)
+_FILE_SCHEMA = [
+    ("id", "id", None),
+    ("display_name", "display_name", ""),
+    ("filename", "filename", ""),
+    ("size", "size", 0),
+    ("content_type", "content-type", ""),
+    ("url", "url", ""),
+    ("created_at", "created_at", None),
+    ("updated_at", "updated_at", None),
+    ("folder_id", "folder_id", None),
+]
+
+_EVENT_SCHEMA = [
+    ("id", "id", None),
+    ("title", "title", ""),
+    ("description", "description", ""),
+    ("start_at", "start_at", None),
+    ("end_at", "end_at", None),
+    ("location_name", "location_name", ""),
+    ("context_name", "context_name", ""),
+    ("type", "type", "event"),
+]
+
+
+def _project(items: List[Dict[str, Any]], schema) -> List[Dict[str, Any]]:
+    """Copy selected fields out of raw Canvas dicts per a field schema"""
+    return [
+        {out: item.get(src, default) for out, src, default in schema}
+        for item in items
+    ]
+
+
+# Process-wide session pool: every CanvasClient with the same
+# credentials shares one connection pool
+_SESSIONS = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def _rate_limit_hook(response, **kwargs):
+    """Response hook: pace requests as the Canvas rate-limit bucket drains
+
+    Canvas throttles with a leaky bucket surfaced via
+    X-Rate-Limit-Remaining (and answers 403 once empty, which the Retry
+    config can't distinguish from a real permission error). Sleeping
+    briefly as the bucket runs low keeps fan-outs under the limit.
+    """
+    remaining = response.headers.get("X-Rate-Limit-Remaining")
+    if remaining is None:
+        return response
+
+    try:
+        remaining = float(remaining)
+    except ValueError:
+        return response
+
+    if remaining < 100:
+        time.sleep(0.2 * (100 - remaining) / 100)
+
+    return response
+
+
+def _shared_session(base_url: str, access_token: str) -> requests.Session:
+    """Get (or lazily create) the pooled session for these credentials"""
+    key = (base_url, access_token)
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(key)
+        if session is None:
+            session = requests.Session()
+            session.headers.update({
+                "Authorization": f"Bearer {access_token}",
+                "Content-Type": "application/json"
+            })
+            adapter = HTTPAdapter(
+                pool_connections=32,
+                pool_maxsize=32,
+                max_retries=Retry(
+                    total=3,
+                    backoff_factor=0.5,
+                    status_forcelist=[429, 500, 502, 503, 504]
+                )
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.hooks["response"].append(_rate_limit_hook)
+            _SESSIONS[key] = session
+        return session
+
+
+# Submission types that mark an assignment as a quiz
+_QUIZ_TYPES = frozenset({"online_quiz"})
+
+# Precompiled patterns for stripping discussion HTML
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_WS_RE = re.compile(r'\s+')
+
+
+def _strip_html(text: str, limit: int = 300) -> str:
+    """Remove HTML tags, collapse whitespace, and truncate"""
+    if not text:
+        return ""
+    text = _WS_RE.sub(' ', _HTML_TAG_RE.sub('', text)).strip()
+    return text[:limit] + "..." if len(text) > limit else text
+
+
+def _freeze_params(params: Optional[Dict]) -> frozenset:
+    """Make query params hashable for use as a cache key"""
+    if not params:
+        return frozenset()
+    return frozenset(
+        (k, tuple(v) if isinstance(v, list) else v)
+        for k, v in params.items()
+    )
+
+
+@lru_cache(maxsize=4096)
+def _parse_iso(date_str: str) -> datetime:
+    """Parse a Canvas ISO-8601 timestamp (memoized — dates repeat heavily)
+
+    fromisoformat accepts the trailing "Z" directly on Python 3.11+
+    (we require 3.12), so no intermediate string is allocated.
+    """
+    return datetime.fromisoformat(date_str)
 
 
 def format_date(date_str: str) -> str:
@@ -22,14 +179,31 @@ def format_date(date_str: str) -> str:
         return "No date"
     
     try:
-        dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-        return dt.strftime("%B %d, %Y at %I:%M %p")
-    except:
+        return _parse_iso(date_str).strftime("%B %d, %Y at %I:%M %p")
+    except (ValueError, TypeError):
         return date_str
     
 class CanvasClient:
     """Client for interacting with Canvas LMS API"""
-    
+
+    # How long to reuse a cached course list (seconds)
+    COURSES_CACHE_TTL = 300
+
+    # Default TTLs for other slow-changing GET endpoints (seconds)
+    ASSIGNMENTS_CACHE_TTL = 60
+    ANNOUNCEMENTS_CACHE_TTL = 60
+    FILES_CACHE_TTL = 600
+
+    # How long a stale calendar result may stand in for a failed fetch
+    CALENDAR_STALE_TTL = 900
+
+    # Exception class and message for common Canvas error statuses
+    _STATUS_ERRORS = {
+        401: (Unauthorized, "Unauthorized: Check your Canvas access token"),
+        403: (Forbidden, "Forbidden: Insufficient permissions"),
+    }
+
+
     def __init__(self, base_url: str = None, access_token: str = None):
         """
         Initialize Canvas client
@@ -38,11 +212,14 @@ class CanvasClient:
             base_url: Canvas instance URL
             access_token: Canvas API access token
         """
-        self.base_url = (base_url or os.getenv("CANVAS_URL")).rstrip('/')
-        self.access_token = access_token or os.getenv("CANVAS_TOKEN")
-        
-        if not self.base_url or not self.access_token:
+        base_url = base_url or os.getenv("CANVAS_URL")
+        access_token = access_token or os.getenv("CANVAS_TOKEN")
+
+        if not base_url or not access_token:
             raise ValueError("Canvas URL and access token are required")
+
+        self.base_url = base_url.rstrip('/')
+        self.access_token = access_token
         
         self.headers = {
             "Authorization": f"Bearer {self.access_token}",
@@ -50,53 +227,277 @@ class CanvasClient:
         }
         
         self.api_base = f"{self.base_url}/api/v1"
-    
+
+        # Persistent pooled session, shared process-wide by credentials
+        # so repeated client constructions don't each pay handshakes
+        self._session = _shared_session(self.base_url, self.access_token)
+
+        # TTL cache for the course list (stable within an agent turn),
+        # plus the announcements context codes derived from it
+        self._courses_cache = None
+        self._courses_cache_ts = 0.0
+        self._context_codes = []
+
+        # ETag cache: (url, frozen params) -> (etag, parsed body)
+        self._etag_cache = {}
+
+        # Generic TTL cache for GET responses: key -> (timestamp, body)
+        self._ttl_cache = {}
+
+        # In-flight GET coalescing: identical concurrent requests share
+        # one Future instead of hitting Canvas twice
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+
+        # Last good calendar result: (timestamp, days_ahead, events)
+        self._last_calendar = None
+
     def _make_request(
-        self, 
-        endpoint: str, 
+        self,
+        endpoint: str,
         method: str = "GET",
         params: Optional[Dict] = None,
-        data: Optional[Dict] = None
+        data: Optional[Dict] = None,
+        paginate: bool = False
     ) -> Any:
         """
-        Make HTTP request to Canvas API
-        
+        Make HTTP request to Canvas API, coalescing duplicate GETs
+
+        Identical GETs issued while one is already in flight (e.g. two
+        parallel tools both listing courses) wait on the first request's
+        Future instead of issuing their own.
+
         Args:
             endpoint: API endpoint (without /api/v1 prefix)
             method: HTTP method
             params: Query parameters
             data: Request body
-            
+            paginate: Follow Link rel="next" headers and return all pages
+
         Returns:
-            JSON response
+            JSON response (all pages concatenated when paginate=True)
         """
+        if method != "GET":
+            return self._do_request(endpoint, method, params, data, paginate)
+
+        key = (endpoint, _freeze_params(params), paginate)
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._inflight[key] = future
+
+        if not is_owner:
+            return future.result()
+
+        try:
+            result = self._do_request(endpoint, method, params, data, paginate)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+    def _do_request(
+        self,
+        endpoint: str,
+        method: str = "GET",
+        params: Optional[Dict] = None,
+        data: Optional[Dict] = None,
+        paginate: bool = False
+    ) -> Any:
+        """Helper: Issue the HTTP request (see _make_request)"""
         url = f"{self.api_base}/{endpoint.lstrip('/')}"
-        
+
+        if paginate:
+            # Canvas defaults to 10 items per page; ask for the max so
+            # fewer round-trips are needed
+            params = dict(params or {})
+            params.setdefault("per_page", 100)
+
+        # Conditional GET: if we hold an ETag for this exact request,
+        # let Canvas answer 304 and reuse the stored body. Paginated
+        # requests are skipped — a first-page 304 wouldn't validate the
+        # remaining pages.
+        cache_key = None
+        cached = None
+        headers = None
+        if method == "GET" and not paginate:
+            cache_key = (url, _freeze_params(params))
+            cached = self._etag_cache.get(cache_key)
+            if cached:
+                headers = {"If-None-Match": cached[0]}
+
         try:
-            response = requests.request(
+            response = self._session.request(
                 method=method,
                 url=url,
-                headers=self.headers,
+                headers=headers,
                 params=params,
-                json=data,
+                # Serialize bodies with orjson; the session already sends
+                # Content-Type: application/json
+                data=orjson.dumps(data) if data is not None else None,
+                timeout=30
+            )
+        except requests.exceptions.RequestException as e:
+            raise CanvasAPIError(f"Request failed: {str(e)}")
+
+        if cached is not None and response.status_code == 304:
+            return cached[1]
+
+        self._check_response(response, endpoint)
+
+        if not paginate:
+            body = orjson.loads(response.content)
+            etag = response.headers.get("ETag")
+            if cache_key is not None and etag:
+                if len(self._etag_cache) >= 256:
+                    # Crude bound: evict the oldest insertion
+                    self._etag_cache.pop(next(iter(self._etag_cache)))
+                self._etag_cache[cache_key] = (etag, body)
+            return body
+
+        # Follow Link: rel="next" until the last page
+        results = orjson.loads(response.content)
+        next_url = response.links.get("next", {}).get("url")
+        while next_url:
+            try:
+                response = self._session.get(next_url, timeout=30)
+            except requests.exceptions.RequestException as e:
+                raise CanvasAPIError(f"Request failed: {str(e)}")
+            self._check_response(response, endpoint)
+            results.extend(orjson.loads(response.content))
+            next_url = response.links.get("next", {}).get("url")
+
+        return results
+
+    def _check_response(self, response: requests.Response, endpoint: str) -> None:
+        """
+        Raise CanvasAPIError for a failed response
+
+        Args:
+            response: The HTTP response to inspect
+            endpoint: Endpoint used in error messages
+
+        Note: 429s are already retried with Retry-After honored by the
+        urllib3 Retry mounted on the session; by the time one reaches
+        here the retries are exhausted.
+        """
+        if response.ok:
+            return
+
+        if response.status_code == 404:
+            raise NotFound(f"Not found: {endpoint}")
+
+        error_cls, message = self._STATUS_ERRORS.get(
+            response.status_code,
+            (CanvasAPIError, f"HTTP {response.status_code}: {response.reason}")
+        )
+        raise error_cls(message)
+
+    def invalidate_caches(self) -> None:
+        """Drop all cached responses (course list, TTL and ETag caches)"""
+        self._courses_cache = None
+        self._courses_cache_ts = 0.0
+        self._ttl_cache.clear()
+        self._etag_cache.clear()
+
+    def _cached_request(
+        self,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        ttl: float = 60,
+        paginate: bool = False
+    ) -> Any:
+        """
+        GET with a short in-process TTL cache
+
+        Args:
+            endpoint: API endpoint (without /api/v1 prefix)
+            params: Query parameters
+            ttl: Seconds to serve the cached response
+            paginate: Follow pagination (passed through to _make_request)
+
+        Returns:
+            JSON response, possibly served from cache
+        """
+        key = (endpoint, _freeze_params(params), paginate)
+        hit = self._ttl_cache.get(key)
+        if hit is not None and time.monotonic() - hit[0] < ttl:
+            return hit[1]
+
+        body = self._make_request(endpoint, params=params, paginate=paginate)
+        if len(self._ttl_cache) >= 256:
+            # Crude bound: evict the oldest insertion
+            self._ttl_cache.pop(next(iter(self._ttl_cache)))
+        self._ttl_cache[key] = (time.monotonic(), body)
+        return body
+
+    def _make_request_many(
+        self,
+        endpoints_with_params: List[Tuple[str, Optional[Dict]]],
+        paginate: bool = False
+    ) -> List[Any]:
+        """
+        Issue multiple GET requests in parallel over the pooled session
+
+        Args:
+            endpoints_with_params: List of (endpoint, params) tuples
+
+        Returns:
+            List of JSON responses in the same order; failed requests
+            yield None instead of raising
+        """
+        if not endpoints_with_params:
+            return []
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            futures = [
+                executor.submit(self._make_request, endpoint, params=params, paginate=paginate)
+                for endpoint, params in endpoints_with_params
+            ]
+
+            results = []
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    print(f"Parallel request failed: {e}")
+                    results.append(None)
+
+            return results
+
+    def _graphql(self, query: str, variables: Optional[Dict] = None) -> Dict[str, Any]:
+        """
+        Make a request to the Canvas GraphQL endpoint
+
+        Args:
+            query: GraphQL query string
+            variables: Optional query variables
+
+        Returns:
+            The "data" portion of the GraphQL response
+        """
+        try:
+            response = self._session.post(
+                f"{self.base_url}/api/graphql",
+                data=orjson.dumps({"query": query, "variables": variables or {}}),
                 timeout=30
             )
             response.raise_for_status()
-            return response.json()
-        
-        except requests.exceptions.HTTPError as e:
-            if response.status_code == 401:
-                raise Exception("Unauthorized: Check your Canvas access token")
-            elif response.status_code == 403:
-                raise Exception("Forbidden: Insufficient permissions")
-            elif response.status_code == 404:
-                raise Exception(f"Not found: {endpoint}")
-            else:
-                raise Exception(f"HTTP {response.status_code}: {str(e)}")
-        
+            payload = orjson.loads(response.content)
         except requests.exceptions.RequestException as e:
-            raise Exception(f"Request failed: {str(e)}")
-    
+            raise CanvasAPIError(f"GraphQL request failed: {str(e)}")
+
+        if payload.get("errors"):
+            raise CanvasAPIError(f"GraphQL errors: {payload['errors']}")
+
+        return payload.get("data", {})
+
     def get_courses(self) -> List[Dict[str, Any]]:
         """
         Get all enrolled courses for current user
@@ -104,64 +505,121 @@ class CanvasClient:
         Returns:
             List of course dictionaries with id, name, course_code, etc.
         """
+        # Serve from cache if fresh — several tools re-enumerate courses
+        # within a single agent turn
+        if (
+            self._courses_cache is not None
+            and time.monotonic() - self._courses_cache_ts < self.COURSES_CACHE_TTL
+        ):
+            return self._courses_cache
+
         courses = self._make_request(
             "courses",
             params={
                 "enrollment_state": "active",
                 "include[]": ["term", "total_scores"]
-            }
+            },
+            paginate=True
         )
     
         # Return simplified course info
-        return [
-            {
+        result = []
+        for course in courses:
+            term = course.get("term") or _EMPTY
+            enrollments = course.get("enrollments")
+            enrollment = enrollments[0] if enrollments else _EMPTY
+
+            result.append({
                 "id": course["id"],
                 "name": course["name"],
                 "course_code": course.get("course_code", ""),
-                "enrollment_term": course.get("term", {}).get("name", ""),
-                "current_grade": course.get("enrollments", [{}])[0].get("computed_current_grade")
-            }
-            for course in courses
-        ]
+                "enrollment_term": term.get("name", ""),
+                "current_grade": enrollment.get("computed_current_grade"),
+                # Scores come inline with include[]=total_scores — keep
+                # them so grade queries need no extra requests
+                "grades": {
+                    "current_score": enrollment.get("computed_current_score"),
+                    "current_grade": enrollment.get("computed_current_grade"),
+                    "final_score": enrollment.get("computed_final_score"),
+                    "final_grade": enrollment.get("computed_final_grade"),
+                    "unposted_current_score": enrollment.get("unposted_current_score"),
+                    "unposted_current_grade": enrollment.get("unposted_current_grade")
+                }
+            })
+
+        self._courses_cache = result
+        self._courses_cache_ts = time.monotonic()
+        self._context_codes = [f"course_{course['id']}" for course in result]
+        return result
     
     # In src/canvas/client.py, add to get_assignments:
 
     def get_assignments(self, course_id: str) -> List[Dict[str, Any]]:
         """Get all assignments for a course"""
-        assignments = self._make_request(
+        assignments = self._cached_request(
             f"courses/{course_id}/assignments",
-            params={
-                "include[]": ["submission", "score_statistics"],
-                "per_page": 100
-            }
+            params={"include[]": ["submission"]},
+            ttl=self.ASSIGNMENTS_CACHE_TTL,
+            paginate=True
         )
-        
+
+        return self._project_assignments(assignments)
+
+    def _project_assignments(self, assignments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Helper: Reduce raw Canvas assignment dicts to the fields we use"""
         result = []
         for assignment in assignments:
-            # Check if it's a quiz
+            submission_types = assignment.get("submission_types") or ()
+            submission = assignment.get("submission") or _EMPTY
+            due_at = assignment.get("due_at")
+
+            # Check if it's a quiz (case-insensitive name match)
             is_quiz = (
-                "online_quiz" in assignment.get("submission_types", []) or
+                not _QUIZ_TYPES.isdisjoint(submission_types) or
                 assignment.get("is_quiz_lti_assignment", False) or
-                "Quiz" in assignment.get("name", "")
+                "quiz" in assignment.get("name", "").lower()
             )
-            
+
             result.append({
                 "id": assignment["id"],
                 "name": assignment["name"],
-                "due_at": format_date(assignment.get("due_at")),
-                "due_at_raw": assignment.get("due_at"),
+                "due_at": format_date(due_at),
+                "due_at_raw": due_at,
                 "points_possible": assignment.get("points_possible"),
-                "submission_types": assignment.get("submission_types", []),
+                "submission_types": list(submission_types),
                 "submitted": assignment.get("has_submitted_submissions", False),
-                "grade": assignment.get("submission", {}).get("grade"),
-                "score": assignment.get("submission", {}).get("score"),
-                "workflow_state": assignment.get("submission", {}).get("workflow_state"),
+                "grade": submission.get("grade"),
+                "score": submission.get("score"),
+                "workflow_state": submission.get("workflow_state"),
                 "is_quiz": is_quiz
             })
-        
+
         return result
 
 
+    @staticmethod
+    def _in_window(due_at_raw: str, now: datetime, future: datetime) -> bool:
+        """
+        Helper: Check whether a raw Canvas due date falls inside [now, future]
+
+        Canvas returns zero-padded UTC timestamps ending in "Z", which
+        compare correctly as plain strings — so the common case needs no
+        datetime construction at all.
+        """
+        if not due_at_raw:
+            return False
+
+        if due_at_raw.endswith('Z'):
+            now_iso = now.strftime("%Y-%m-%dT%H:%M:%SZ")
+            future_iso = future.strftime("%Y-%m-%dT%H:%M:%SZ")
+            return now_iso <= due_at_raw <= future_iso
+
+        try:
+            due_date = _parse_iso(due_at_raw)
+        except ValueError:
+            return False
+        return now <= due_date <= future
+
     def get_upcoming_assignments(self, days: int = 7) -> List[Dict[str, Any]]:
         """
         Get assignments due in the next N days across all courses
@@ -172,41 +630,177 @@ class CanvasClient:
         Returns:
             List of upcoming assignments with course info
         """
-        courses = self.get_courses()
-        upcoming = []
-        
         # Make timezone-aware datetimes (UTC)
-        from datetime import timezone
         now = datetime.now(timezone.utc)
         future = now + timedelta(days=days)
-        
-        for course in courses:
-            try:
-                assignments = self.get_assignments(course["id"])
-                
-                for assignment in assignments:
-                    if assignment["due_at"]:
-                        # Parse ISO datetime (Canvas returns UTC with Z)
-                        due_date = datetime.fromisoformat(
-                            assignment["due_at"].replace('Z', '+00:00')
-                        )
-                        
-                        # Check if due within time window
-                        if now <= due_date <= future:
-                            upcoming.append({
-                                **assignment,
-                                "course_name": course["name"],
-                                "course_code": course["course_code"]
-                            })
-            except Exception as e:
-                print(f"Error fetching assignments for {course['name']}: {e}")
+
+        # Try one GraphQL round-trip first; fall back to the per-course
+        # REST fan-out if the instance doesn't support it
+        try:
+            return self._get_upcoming_graphql(now, future)
+        except Exception as e:
+            print(f"GraphQL upcoming-assignments query failed, using REST: {e}")
+
+        courses = self.get_courses()
+
+        # Next-best: one server-filtered upcoming_events request instead
+        # of fetching every course's full assignment list
+        try:
+            return self._get_upcoming_events(courses, future)
+        except Exception as e:
+            print(f"upcoming_events query failed, using per-course fan-out: {e}")
+
+        upcoming = []
+
+        # Fetch all courses' assignments in parallel instead of serially
+        assignment_params = {"include[]": ["submission"]}
+        responses = self._make_request_many(
+            [
+                (f"courses/{course['id']}/assignments", assignment_params)
+                for course in courses
+            ],
+            paginate=True
+        )
+
+        for course, raw_assignments in zip(courses, responses):
+            if raw_assignments is None:
+                print(f"Error fetching assignments for {course['name']}")
                 continue
-        
-        # Sort by due date
-        upcoming.sort(key=lambda x: x["due_at"])
+
+            for assignment in self._project_assignments(raw_assignments):
+                # Check if due within time window
+                if self._in_window(assignment["due_at_raw"], now, future):
+                    upcoming.append({
+                        **assignment,
+                        "course_name": course["name"],
+                        "course_code": course["course_code"]
+                    })
+
+        # Sort by due date — raw ISO strings order chronologically;
+        # the formatted "October …" strings do not
+        upcoming.sort(key=lambda x: x["due_at_raw"] or "")
         return upcoming
 
-    
+    _UPCOMING_QUERY = """
+    query UpcomingAssignments {
+      allCourses {
+        _id
+        name
+        courseCode
+        assignmentsConnection(first: 100) {
+          nodes {
+            _id
+            name
+            dueAt
+            pointsPossible
+            submissionsConnection(first: 1) {
+              nodes {
+                submittedAt
+                grade
+                score
+                state
+              }
+            }
+          }
+        }
+      }
+    }
+    """
+
+    def _get_upcoming_graphql(self, now: datetime, future: datetime) -> List[Dict[str, Any]]:
+        """
+        Helper: Fetch upcoming assignments across all courses in a single
+        GraphQL request instead of one REST call per course
+
+        Args:
+            now: Window start (timezone-aware)
+            future: Window end (timezone-aware)
+
+        Returns:
+            List of upcoming assignments with course info, sorted by due date
+        """
+        data = self._graphql(self._UPCOMING_QUERY)
+
+        upcoming = []
+        for course in data.get("allCourses") or []:
+            nodes = (course.get("assignmentsConnection") or {}).get("nodes") or []
+
+            for node in nodes:
+                due_at_raw = node.get("dueAt")
+                if not self._in_window(due_at_raw, now, future):
+                    continue
+
+                submissions = (node.get("submissionsConnection") or {}).get("nodes") or []
+                submission = submissions[0] if submissions else {}
+
+                upcoming.append({
+                    "id": node["_id"],
+                    "name": node["name"],
+                    "due_at": format_date(due_at_raw),
+                    "due_at_raw": due_at_raw,
+                    "points_possible": node.get("pointsPossible"),
+                    "submitted": bool(submission.get("submittedAt")),
+                    "grade": submission.get("grade"),
+                    "score": submission.get("score"),
+                    "workflow_state": submission.get("state"),
+                    "course_name": course["name"],
+                    "course_code": course.get("courseCode", "")
+                })
+
+        upcoming.sort(key=lambda x: x["due_at_raw"])
+        return upcoming
+
+    def _get_upcoming_events(self, courses: List[Dict[str, Any]], future: datetime) -> List[Dict[str, Any]]:
+        """
+        Helper: Fetch upcoming assignments via the server-filtered
+        upcoming_events endpoint — one request, no client-side windowing
+
+        Args:
+            courses: Projected course list (for course name/code lookup)
+            future: Window end (timezone-aware)
+
+        Returns:
+            List of upcoming assignments with course info, sorted by due date
+        """
+        events = self._make_request(
+            "users/self/upcoming_events",
+            params={
+                "context_codes[]": [f"course_{c['id']}" for c in courses],
+                "end_date": future.isoformat()
+            }
+        )
+
+        by_id = {str(c["id"]): c for c in courses}
+
+        upcoming = []
+        for event in events:
+            assignment = event.get("assignment")
+            if not assignment:
+                continue
+
+            course = by_id.get(
+                event.get("context_code", "").replace("course_", ""), {}
+            )
+            submission = assignment.get("submission") or {}
+
+            upcoming.append({
+                "id": assignment["id"],
+                "name": assignment["name"],
+                "due_at": format_date(assignment.get("due_at")),
+                "due_at_raw": assignment.get("due_at"),
+                "points_possible": assignment.get("points_possible"),
+                "submitted": assignment.get("has_submitted_submissions", False),
+                "grade": submission.get("grade"),
+                "score": submission.get("score"),
+                "workflow_state": submission.get("workflow_state"),
+                "course_name": course.get("name", event.get("context_name", "")),
+                "course_code": course.get("course_code", "")
+            })
+
+        upcoming.sort(key=lambda x: x["due_at_raw"] or "")
+        return upcoming
+
+
     def get_grades(self, course_id: str) -> Dict[str, Any]:
         """
         Get grade information for a course
@@ -219,7 +813,8 @@ class CanvasClient:
         """
         enrollments = self._make_request(
             f"courses/{course_id}/enrollments",
-            params={"user_id": "self"}
+            params={"user_id": "self"},
+            paginate=True
         )
         
         if not enrollments:
@@ -245,26 +840,18 @@ class CanvasClient:
             List of course grades
         """
         try:
-            courses = self.get_courses()
-            
-            all_grades = []
-            for course in courses:
-                course_id = str(course["id"])
-                
-                try:
-                    grades = self.get_grades(course_id)
-                    all_grades.append({
-                        "course_id": course_id,
-                        "course_name": course["name"],
-                        "course_code": course.get("course_code", ""),
-                        "grades": grades
-                    })
-                except:
-                    # Skip courses that error
-                    continue
-            
-            return all_grades
-        
+            # The course listing already carries every course's scores
+            # (include[]=total_scores), so no per-course requests at all
+            return [
+                {
+                    "course_id": str(course["id"]),
+                    "course_name": course["name"],
+                    "course_code": course.get("course_code", ""),
+                    "grades": course["grades"]
+                }
+                for course in self.get_courses()
+            ]
+
         except Exception as e:
             return [{"error": f"Could not fetch grades: {str(e)}"}]
         
@@ -279,71 +866,110 @@ class CanvasClient:
             Course summary with grades, upcoming assignments, recent announcements
         """
         try:
-            # Get course info
-            courses = self.get_courses()
-            course = next((c for c in courses if str(c["id"]) == str(course_id)), None)
-            
-            if not course:
-                return {"error": "Course not found"}
-            
-            # Gather data
-            summary = {
-                "course_name": course["name"],
-                "course_code": course.get("course_code", ""),
-                "grades": self.get_grades(course_id),
-                "upcoming_assignments": [],
-                "recent_announcements": []
-            }
-            
-            # Get upcoming assignments (due in next 7 days)
+            # Get course info with a single O(1) lookup instead of
+            # listing (and discarding) every enrollment
             try:
-                from datetime import datetime, timedelta
-                assignments = self.get_assignments(course_id)
-                now = datetime.now()
-                week_from_now = now + timedelta(days=7)
-                
-                for assignment in assignments:
-                    due_at_raw = assignment.get("due_at_raw")
-                    if due_at_raw:
-                        try:
-                            due_date = datetime.fromisoformat(due_at_raw.replace('Z', '+00:00'))
-                            if now <= due_date <= week_from_now:
-                                summary["upcoming_assignments"].append(assignment)
-                        except:
-                            continue
-            except:
-                pass
-            
-            # Get recent announcements
-            try:
-                announcements = self.get_announcements(course_id)
-                summary["recent_announcements"] = announcements[:3]  # Latest 3
-            except:
-                pass
+                course = self._make_request(
+                    f"courses/{course_id}",
+                    params={"include[]": ["term"]}
+                )
+            except CanvasAPIError:
+                return {"error": "Course not found"}
             
+            # The three subcalls are independent — fire them concurrently
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                f_grades = executor.submit(self.get_grades, course_id)
+                f_assignments = executor.submit(self.get_assignments, course_id)
+                f_announcements = executor.submit(
+                    self.get_announcements, 7, [course_id]
+                )
+
+                summary = {
+                    "course_name": course["name"],
+                    "course_code": course.get("course_code", ""),
+                    "grades": f_grades.result(),
+                    "upcoming_assignments": [],
+                    "recent_announcements": []
+                }
+
+                # Get upcoming assignments (due in next 7 days)
+                try:
+                    assignments = f_assignments.result()
+                    now = datetime.now(timezone.utc)
+                    week_from_now = now + timedelta(days=7)
+
+                    for assignment in assignments:
+                        if self._in_window(assignment.get("due_at_raw"), now, week_from_now):
+                            summary["upcoming_assignments"].append(assignment)
+                except CanvasAPIError:
+                    pass
+
+                # Get recent announcements
+                try:
+                    announcements = f_announcements.result()
+                    summary["recent_announcements"] = announcements[:3]  # Latest 3
+                except CanvasAPIError:
+                    pass
+
             return summary
         
         except Exception as e:
             return {"error": f"Could not fetch course summary: {str(e)}"}
 
     
-    def get_announcements(self, days: int = 7) -> List[Dict[str, Any]]:
+    def get_dashboard(self, days: int = 7) -> Dict[str, Any]:
         """
-        Get recent announcements from all courses
-        
+        Get courses, upcoming assignments, and recent announcements in one pass
+
+        Args:
+            days: Look-ahead window for assignments and look-back for
+                announcements
+
+        Returns:
+            Dict with courses, upcoming_assignments and recent_announcements
+        """
+        try:
+            courses = self.get_courses()
+
+            # The two remaining fetches are independent — overlap them
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                f_upcoming = executor.submit(self.get_upcoming_assignments, days)
+                f_announcements = executor.submit(self.get_announcements, days)
+
+                return {
+                    "courses": courses,
+                    "upcoming_assignments": f_upcoming.result(),
+                    "recent_announcements": f_announcements.result()
+                }
+
+        except Exception as e:
+            return {"error": f"Could not fetch dashboard: {str(e)}"}
+
+    def get_announcements(
+        self,
+        days: int = 7,
+        course_ids: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Get recent announcements from all courses (or specific ones)
+
         Args:
             days: Number of days to look back
-            
+            course_ids: Optional course IDs to restrict to; skips the
+                course-list lookup entirely
+
         Returns:
             List of announcements
         """
-        courses = self.get_courses()
-        
-        # Build context codes for all courses
-        context_codes = [f"course_{course['id']}" for course in courses]
+        if course_ids:
+            context_codes = [f"course_{course_id}" for course_id in course_ids]
+        else:
+            self.get_courses()  # refreshes _context_codes if stale
+            context_codes = self._context_codes
         
-        # Calculate start date
-        start_date = (datetime.now() - timedelta(days=days)).isoformat()
+        # Date-only: a "last N days" filter doesn't need sub-day
+        # precision, and a stable value lets the TTL cache actually hit
+        start_date = (datetime.now() - timedelta(days=days)).date().isoformat()
         
         # Build query parameters
         params = {
@@ -351,7 +977,10 @@ class CanvasClient:
             "start_date": start_date
         }
         
-        announcements = self._make_request("announcements", params=params)
+        announcements = self._cached_request(
+            "announcements", params=params,
+            ttl=self.ANNOUNCEMENTS_CACHE_TTL, paginate=True
+        )
         
         return [
             {
@@ -375,22 +1004,10 @@ class CanvasClient:
         Returns:
             List of discussion topics
         """
-        import re
-        
-        def strip_html(text: str) -> str:
-            """Remove HTML tags and clean up text"""
-            if not text:
-                return ""
-            # Remove HTML tags
-            text = re.sub(r'<[^>]+>', '', text)
-            # Remove extra whitespace
-            text = ' '.join(text.split())
-            # Limit length
-            return text[:300] + "..." if len(text) > 300 else text
-        
         try:
             discussions = self._make_request(
-                f"courses/{course_id}/discussion_topics"
+                f"courses/{course_id}/discussion_topics",
+                paginate=True
             )
             
             if not discussions:
@@ -400,7 +1017,7 @@ class CanvasClient:
                 {
                     "id": disc["id"],
                     "title": disc["title"],
-                    "message": strip_html(disc.get("message", "")),
+                    "message": _strip_html(disc.get("message", "")),
                     "posted_at": disc.get("posted_at"),
                     "author": disc.get("author", {}).get("display_name", "Unknown"),
                     "unread_count": disc.get("unread_count", 0),
@@ -421,24 +1038,13 @@ class CanvasClient:
         Returns:
             List of files
         """
-        files = self._make_request(
-            f"courses/{course_id}/files"
+        files = self._cached_request(
+            f"courses/{course_id}/files",
+            ttl=self.FILES_CACHE_TTL,
+            paginate=True
         )
         
-        return [
-            {
-                "id": file["id"],
-                "display_name": file.get("display_name", ""),
-                "filename": file.get("filename", ""),
-                "size": file.get("size", 0),
-                "content_type": file.get("content-type", ""),
-                "url": file.get("url", ""),
-                "created_at": file.get("created_at"),
-                "updated_at": file.get("updated_at"),
-                "folder_id": file.get("folder_id")
-            }
-            for file in files
-        ]
+        return _project(files, _FILE_SCHEMA)
 
     def get_calendar_events(self, days_ahead: int = 14) -> List[Dict[str, Any]]:
         """
@@ -450,10 +1056,9 @@ class CanvasClient:
         Returns:
             List of calendar events
         """
-        from datetime import timezone
-        
-        start_date = datetime.now(timezone.utc).isoformat()
-        end_date = (datetime.now(timezone.utc) + timedelta(days=days_ahead)).isoformat()
+        now = datetime.now(timezone.utc)
+        start_date = now.isoformat()
+        end_date = (now + timedelta(days=days_ahead)).isoformat()
         
         # Use different endpoint that doesn't require special permissions
         try:
@@ -463,26 +1068,34 @@ class CanvasClient:
                     "start_date": start_date,
                     "end_date": end_date,
                     "type": "assignment"  # Just get assignment events
-                }
+                },
+                paginate=True
             )
         except Exception as e:
+            # Serve the last good result if it's recent — far cheaper
+            # than the assignment fan-out fallback
+            if (
+                self._last_calendar is not None
+                and self._last_calendar[1] == days_ahead
+                and time.monotonic() - self._last_calendar[0] < self.CALENDAR_STALE_TTL
+            ):
+                print(f"Calendar API failed, serving last good result: {e}")
+                return self._last_calendar[2]
+
             # Fallback: get upcoming assignments instead
             print(f"Calendar API failed, using assignments: {e}")
             return self.get_upcoming_assignments(days_ahead)
-        
-        return [
-            {
-                "id": event["id"],
-                "title": event["title"],
-                "description": event.get("description", ""),
-                "start_at": event.get("start_at"),
-                "end_at": event.get("end_at"),
-                "location_name": event.get("location_name", ""),
-                "context_name": event.get("context_name", ""),
-                "type": event.get("type", "event")
-            }
-            for event in events
-        ]
+
+        result = _project(events, _EVENT_SCHEMA)
+
+        # Descriptions arrive as HTML; strip and cap them so they don't
+        # waste tokens downstream
+        for event in result:
+            if event["description"]:
+                event["description"] = _strip_html(event["description"], limit=200)
+
+        self._last_calendar = (time.monotonic(), days_ahead, result)
+        return result
 
     def get_modules(self, course_id: str) -> List[Dict[str, Any]]:
         """
@@ -497,7 +1110,8 @@ class CanvasClient:
         try:
             modules = self._make_request(
                 f"courses/{course_id}/modules",
-                params={"include[]": ["items"]}
+                params={"include[]": ["items"]},
+                paginate=True
             )
             
             # If no modules found, return files instead
@@ -530,6 +1144,45 @@ class CanvasClient:
             return self._get_files_as_modules(course_id)
 
 
+    def get_modules_minimal(self, course_id: str) -> List[Dict[str, Any]]:
+        """
+        Get modules projected down to what the MCP tool returns
+
+        One projection pass instead of get_modules' full projection plus
+        a second trim in the tool handler.
+
+        Args:
+            course_id: Canvas course ID
+
+        Returns:
+            List of modules with name, items_count, and item title/type
+        """
+        try:
+            modules = self._make_request(
+                f"courses/{course_id}/modules",
+                params={"include[]": ["items"]},
+                paginate=True
+            )
+            if not modules:
+                modules = self._get_files_as_modules(course_id)
+        except Exception:
+            modules = self._get_files_as_modules(course_id)
+
+        return [
+            {
+                "name": module.get("name", ""),
+                "items_count": module.get("items_count", 0),
+                "items": [
+                    {
+                        "title": item.get("title", ""),
+                        "type": item.get("type", "")
+                    }
+                    for item in (module.get("items") or [])[:10]  # First 10 items
+                ]
+            }
+            for module in modules
+        ]
+
     def _get_files_as_modules(self, course_id: str) -> List[Dict[str, Any]]:
         """
         Helper: Return course files formatted as a module structure
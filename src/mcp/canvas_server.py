@@ -1,13 +1,17 @@
+import asyncio
+
+import orjson
 from fastmcp import FastMCP
 from pydantic import Field
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import os
 from dotenv import load_dotenv
 
 # Import Canvas client
 from src.canvas.client import CanvasClient
 
-load_dotenv()
+if not os.getenv("CANVAS_URL"):
+    load_dotenv()
 
 # Initialize Canvas client
 canvas = CanvasClient(
@@ -15,9 +19,15 @@ canvas = CanvasClient(
     access_token=os.getenv("CANVAS_TOKEN")
 )
 
+def _serialize_tool_result(data) -> str:
+    """Serialize tool results with orjson (faster than the default json)"""
+    return orjson.dumps(data).decode()
+
+
 # Create MCP server
 mcp = FastMCP(
     name="canvas-lms",
+    tool_serializer=_serialize_tool_result,
     instructions="""
     This is a Canvas LMS server that provides access to:
     - Course information and enrollment data
@@ -37,7 +47,7 @@ async def get_courses() -> List[Dict[str, Any]]:
     Returns a list of courses with id, name, course_code, enrollment term, 
     and current grade information.
     """
-    return canvas.get_courses()
+    return await asyncio.to_thread(canvas.get_courses)
 
 
 @mcp.tool()
@@ -53,7 +63,7 @@ async def get_assignments(
     - Submission status (submitted or not)
     - Grade and score if submitted
     """
-    return canvas.get_assignments(course_id)
+    return await asyncio.to_thread(canvas.get_assignments, course_id)
 
 
 @mcp.tool()
@@ -68,7 +78,7 @@ async def get_upcoming_assignments(
     Returns assignments due within the specified number of days,
     sorted by due date. Includes course information for each assignment.
     """
-    return canvas.get_upcoming_assignments(days)
+    return await asyncio.to_thread(canvas.get_upcoming_assignments, days)
 
 
 @mcp.tool()
@@ -80,7 +90,7 @@ async def get_grades(
     Returns current grade, final grade, scores, and unposted grades
     for the specified course.
     """
-    return canvas.get_grades(course_id)
+    return await asyncio.to_thread(canvas.get_grades, course_id)
 
 
 @mcp.tool()
@@ -88,14 +98,20 @@ async def get_announcements(
     days: int = Field(
         default=7,
         description="Number of days to look back (default: 7)"
+    ),
+    course_id: Optional[str] = Field(
+        default=None,
+        description="Optional Canvas course ID to restrict announcements to"
     )
 ) -> List[Dict[str, Any]]:
-    """Get recent announcements from all enrolled courses.
+    """Get recent announcements from enrolled courses.
     
     Returns announcements posted within the specified number of days,
-    including title, message, author, and posting date.
+    including title, message, author, and posting date. Covers all
+    courses unless course_id narrows it to one.
     """
-    return canvas.get_announcements(days)
+    course_ids = [course_id] if course_id else None
+    return await asyncio.to_thread(canvas.get_announcements, days, course_ids)
 
 @mcp.tool()
 async def get_discussions(
@@ -109,7 +125,7 @@ async def get_discussions(
     - Unread count and reply count
     - Discussion type
     """
-    return canvas.get_discussions(course_id)
+    return await asyncio.to_thread(canvas.get_discussions, course_id)
 
 
 @mcp.tool()
@@ -124,7 +140,7 @@ async def get_course_files(
     - Upload/update dates
     - Download URL
     """
-    return canvas.get_course_files(course_id)
+    return await asyncio.to_thread(canvas.get_course_files, course_id)
 
 
 @mcp.tool()
@@ -142,7 +158,7 @@ async def get_calendar_events(
     - Location
     - Associated course
     """
-    return canvas.get_calendar_events(days_ahead)
+    return await asyncio.to_thread(canvas.get_calendar_events, days_ahead)
 
 @mcp.tool()
 async def get_modules(
@@ -153,27 +169,7 @@ async def get_modules(
     Returns modules with clean, essential information only.
     If the course has no modules, automatically returns course files instead.
     """
-    modules = canvas.get_modules(course_id)
-    
-    # Clean up the output - remove unnecessary fields
-    cleaned = []
-    for module in modules:
-        cleaned_module = {
-            "name": module.get("name", ""),
-            "items_count": module.get("items_count", 0),
-            "items": []
-        }
-        
-        # Only include item names and types, not IDs
-        for item in module.get("items", [])[:10]:  # Limit to 10 items
-            cleaned_module["items"].append({
-                "title": item.get("title", ""),
-                "type": item.get("type", "")
-            })
-        
-        cleaned.append(cleaned_module)
-    
-    return cleaned
+    return await asyncio.to_thread(canvas.get_modules_minimal, course_id)
 
 @mcp.tool()
 async def get_quizzes(
@@ -191,7 +187,7 @@ async def get_quizzes(
     
     Useful for checking quiz deadlines and requirements.
     """
-    return canvas.get_quizzes(course_id)
+    return await asyncio.to_thread(canvas.get_quizzes, course_id)
 
 @mcp.tool()
 async def get_assignment_submission(
@@ -210,7 +206,7 @@ async def get_assignment_submission(
     Useful for checking feedback and submission status.
     """
     # First get all assignments to find the ID
-    assignments = canvas.get_assignments(course_id)
+    assignments = await asyncio.to_thread(canvas.get_assignments, course_id)
     
     # Find matching assignment by name (case-insensitive partial match)
     matching_assignment = None
@@ -225,7 +221,9 @@ async def get_assignment_submission(
         return {"error": f"Assignment '{assignment_name}' not found in course"}
     
     # Get submission details
-    return canvas.get_assignment_submissions(course_id, str(matching_assignment["id"]))
+    return await asyncio.to_thread(
+        canvas.get_assignment_submissions, course_id, str(matching_assignment["id"])
+    )
 
 @mcp.tool()
 async def get_quiz_submissions(
@@ -244,7 +242,7 @@ async def get_quiz_submissions(
     
     This tool combines quiz metadata with actual submission grades.
     """
-    return canvas.get_quiz_submissions(course_id)
+    return await asyncio.to_thread(canvas.get_quiz_submissions, course_id)
 
 @mcp.tool()
 async def get_all_grades() -> List[Dict[str, Any]]:
@@ -253,7 +251,7 @@ async def get_all_grades() -> List[Dict[str, Any]]:
     More efficient than calling get_grades separately for each course.
     Use this when user asks "How am I doing overall?" or "Show all my grades".
     """
-    return canvas.get_all_grades()
+    return await asyncio.to_thread(canvas.get_all_grades)
 
 
 @mcp.tool()
@@ -269,12 +267,41 @@ async def get_course_summary(
     
     Use this when user asks "How's [course] going?" or "Tell me about [course]".
     """
-    return canvas.get_course_summary(course_id)
+    return await asyncio.to_thread(canvas.get_course_summary, course_id)
+
+
+@mcp.tool()
+async def get_dashboard(
+    days: int = Field(
+        default=7,
+        description="Days to look ahead for assignments / back for announcements (default: 7)"
+    )
+) -> Dict[str, Any]:
+    """Get a full dashboard in one call: courses, upcoming assignments,
+    and recent announcements.
+
+    Use this for "morning briefing" style questions ("What's going on?",
+    "Catch me up") instead of calling the individual tools back-to-back.
+    """
+    return await asyncio.to_thread(canvas.get_dashboard, days)
 
 
 def main():
-    """Entry point for the Canvas MCP server."""
-    mcp.run()
+    """Entry point for the Canvas MCP server.
+
+    Defaults to stdio for the embedded clients; set MCP_TRANSPORT=http
+    to serve stateless streamable HTTP instead, which lets many clients
+    share one long-lived server process without per-spawn handshakes.
+    """
+    if os.getenv("MCP_TRANSPORT") == "http":
+        mcp.run(
+            transport="streamable-http",
+            host=os.getenv("MCP_HOST", "127.0.0.1"),
+            port=int(os.getenv("MCP_PORT", "8765")),
+            stateless_http=True,
+        )
+    else:
+        mcp.run()
 
 
 if __name__ == "__main__":
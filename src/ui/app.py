@@ -1,11 +1,16 @@
+import asyncio
 import chainlit as cl
 import os
 import sys
 import time
-from datetime import datetime
+import traceback
+from dataclasses import dataclass
 from pathlib import Path
+from botocore.config import Config
 from dotenv import load_dotenv
 from langchain_aws import ChatBedrockConverse
+from langchain_core.messages import AIMessage
+from langchain_core.messages.utils import count_tokens_approximately, trim_messages
 from langchain_mcp_adapters.tools import load_mcp_tools
 from langgraph.prebuilt import create_react_agent
 from langgraph.checkpoint.memory import MemorySaver  # SIMPLER OPTION
@@ -16,187 +21,194 @@ from mcp.client.stdio import stdio_client
 root_dir = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(root_dir))
 
-from src.utils.token_tracker import TokenTracker
+from src.utils.token_tracker import SessionTracker, TokenTracker
 
 load_dotenv()
 
+# One tracker per process: a single log file, pricing table, and
+# hydration pass shared by every chat
+_tracker = TokenTracker()
+
+
+@dataclass(slots=True)
+class ChatCtx:
+    """Per-chat state, stored under a single user-session key"""
+    tracker: SessionTracker
+    session_id: str
+    agent: object = None
+    model_id: str = ""
+    config: dict = None
+
+
+# One long-lived MCP server process shared by every chat session.
+# Spawning the stdio subprocess per chat paid Python interpreter startup
+# plus the MCP handshake on every connect, which dominated first-message
+# latency.
+_mcp_lock = asyncio.Lock()
+_mcp_session = None
+_mcp_tools = None
+
+# Strong refs to fire-and-forget tasks so they aren't garbage collected
+_bg_tasks = set()
+
+
+async def _get_mcp_session():
+    """Return the shared MCP session and tool list, connecting on first use"""
+    global _mcp_session, _mcp_tools
+
+    async with _mcp_lock:
+        if _mcp_session is not None:
+            # Health-check the idle connection before handing it out
+            try:
+                await _mcp_session.send_ping()
+            except Exception:
+                _mcp_session = None
+                _mcp_tools = None
+
+        if _mcp_session is None:
+            server_params = StdioServerParameters(
+                command="sh",
+                args=["-c", "PYTHONPATH=. uv run src/mcp/canvas_server.py"]
+            )
 
-@cl.on_chat_start
-async def on_chat_start():
-    """Initialize the chat session with Canvas MCP connection"""
-    
-    # Initialize token tracker
-    tracker = TokenTracker()
-    session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
-    cl.user_session.set("tracker", tracker)
-    cl.user_session.set("session_id", session_id)
-    
-    # Show loading message
-    msg = cl.Message(content="🔌 Connecting to Canvas...")
-    await msg.send()
-    
-    try:
-        # MCP server parameters
-        server_params = StdioServerParameters(
-            command="sh",
-            args=["-c", "PYTHONPATH=. uv run src/mcp/canvas_server.py"]
-        )
-        
-        # Connect to MCP server
-        stdio_context = stdio_client(server_params)
-        read, write = await stdio_context.__aenter__()
-        
-        session = ClientSession(read, write)
-        await session.__aenter__()
-        await session.initialize()
-        
-        # Load Canvas tools
-        tools = await load_mcp_tools(session)
-        
-        # Create Bedrock LLM
-        model_id = os.getenv("MODEL_ID", "meta.llama4-maverick-17b-instruct-v1:0")
-        llm = ChatBedrockConverse(
-            model=f"us.{model_id}",
-            region_name=os.getenv("AWS_REGION", "us-east-1"),
-            temperature=0.3,
-            max_tokens=4096
-        )
-        
-        # CREATE IN-MEMORY CHECKPOINTER
-        memory = MemorySaver()
-        
-        # Create ReAct agent WITH MEMORY - simpler prompt
-        agent = create_react_agent(
-            llm,
-            tools,
-            checkpointer=memory,
-            prompt="""You are a Canvas LMS assistant with access to Canvas API tools.
-
-CORE MISSION:
-Help students manage their coursework by fetching real-time data from Canvas.
-Be efficient, accurate, and conversational.
-
-═══════════════════════════════════════════════════════════════
-
-AVAILABLE TOOLS:
-
-Core Tools:
-• get_courses() - List all enrolled courses
-• get_upcoming_assignments() - Get assignments due soon across ALL courses
-
-Course-Specific Tools:
-• get_assignments(course_id) - Get all assignments for a course
-• get_quizzes(course_id) - Get quizzes (includes LTI/external tool quizzes)
-• get_quiz_submissions(course_id) - Get quiz grades and scores
-• get_grades(course_id) - Get overall course grade
-• get_announcements(course_id) - Get recent announcements
-• get_discussions(course_id) - Get discussion topics
-• get_modules(course_id) - Get course modules/structure
-• get_course_files(course_id) - Get course files
-
-Calendar:
-• get_calendar_events() - Get upcoming events
-
-═══════════════════════════════════════════════════════════════
-
-TOOL SELECTION STRATEGY:
-
-1. Use the MOST SPECIFIC tool available:
-   ✓ "What's due this week?" → get_upcoming_assignments() (NOT get_courses + loop)
-   ✓ "Quiz grades?" → get_quiz_submissions(course_id) (NOT get_assignments + filter)
-   ✓ "My courses?" → get_courses() (single call)
-
-2. Leverage conversation memory:
-   - If user mentioned "CS 555" earlier, remember the course_id
-   - Don't re-fetch courses if you just got them
-   - Reference previous answers: "As I mentioned, you have 5 courses..."
-
-3. Multi-step queries are OK when necessary:
-   - "How am I doing overall?" → get_courses, then get_grades for each
-   - Complex questions may need 3-5 tool calls - that's fine
-   - But always choose the most direct path
-
-4. Handle errors gracefully:
-   - If a tool returns an error, acknowledge it and move on
-   - Don't retry the same tool with same parameters
-   - Suggest alternatives: "I can't access quizzes, but I can show assignments"
-
-═══════════════════════════════════════════════════════════════
-
-RESPONSE PATTERNS:
-
-For "What's due this week?":
-→ Call get_upcoming_assignments()
-→ Group by course or date
-→ Highlight urgent items
-
-For "How did I do on [course] quizzes?":
-→ Call get_courses to find course_id (or use memory)
-→ Call get_quiz_submissions(course_id)
-→ Show scores clearly: "Quiz 1: 8.5/10, Quiz 2: 10/10"
-
-For "What courses am I taking?":
-→ Call get_courses()
-→ List with course codes: "CS 555, CS 559, CS 584, FE 520"
-
-For "How am I doing in [course]?":
-→ Call get_grades(course_id)
-→ Show current grade and breakdown if available
+            stdio_context = stdio_client(server_params)
+            read, write = await stdio_context.__aenter__()
 
-═══════════════════════════════════════════════════════════════
+            session = ClientSession(read, write)
+            await session.__aenter__()
+            await session.initialize()
 
-OUTPUT FORMATTING:
+            _mcp_session = session
+            _mcp_tools = await load_mcp_tools(session)
 
-• Use bullet points for lists
-• Format dates: "October 22, 2025" (not ISO timestamps)
-• Format scores: "8.5/10" or "85%" (not raw decimals)
-• Be conversational but concise
-• Never show raw JSON, course IDs, or technical details
-• Group related items logically
+        return _mcp_session, _mcp_tools
 
-═══════════════════════════════════════════════════════════════
 
-CONVERSATION MEMORY:
+# Kept deliberately short: the prompt is re-sent as input context on
+# every LLM call in the ReAct loop, so each extra line is billed per
+# tool iteration
+SYSTEM_PROMPT = """You are a Canvas LMS assistant with access to Canvas API tools.
+Help students manage their coursework with real-time Canvas data.
+Be efficient, accurate, and conversational.
 
-You maintain context across the conversation:
-• Remember courses the user asked about
-• Reference previous queries naturally
-• Make connections: "You mentioned Quiz 5 earlier - it's due tomorrow"
-• Be proactive: "You have 3 assignments due this week, including that quiz we discussed"
+TOOLS:
+- Across all courses: get_courses(), get_upcoming_assignments(), get_all_grades(), get_calendar_events(), get_announcements(course_id optional)
+- Per course (need course_id): get_assignments, get_quizzes, get_quiz_submissions, get_grades, get_discussions, get_modules, get_course_files
 
-═══════════════════════════════════════════════════════════════
+TOOL SELECTION:
+- Use the most specific tool: "due this week?" -> get_upcoming_assignments(); "how am I doing overall?" -> get_all_grades() in ONE call, never get_grades per course.
+- Reuse course_ids and results already in the conversation instead of re-fetching.
+- If a tool errors, acknowledge it and suggest an alternative; never retry the same call with the same arguments.
 
-EXAMPLES:
+OUTPUT:
+- Bullet points for lists; dates like "October 22, 2025"; scores like "8.5/10" or "85%".
+- Never show raw JSON, course IDs, or technical details.
+- Highlight unsubmitted work and urgent deadlines.
+"""
 
-User: "What courses am I taking?"
-You: "You're enrolled in 4 courses:
-• CS 555 - Agile Methods
-• CS 559 - Machine Learning
-• CS 584 - Natural Language Processing
-• FE 520 - Python for Finance"
+def _trim_history(state):
+    """Cap the history sent to the model on each ReAct step
+
+    MemorySaver keeps the full conversation, so without a bound the
+    input tokens per turn grow linearly over a long chat. Keep the most
+    recent turns under a fixed budget; the checkpointer still retains
+    everything.
+    """
+    trimmed = trim_messages(
+        state["messages"],
+        strategy="last",
+        token_counter=count_tokens_approximately,
+        max_tokens=4096,
+        start_on="human",
+        include_system=True
+    )
+    return {"llm_input_messages": trimmed}
+
+
+# Agents are built once per model and shared across chat sessions; the
+# MemorySaver checkpointer isolates conversations by thread_id
+_agents = {}
+
+
+async def _get_agent(model_id: str):
+    """Return the shared ReAct agent for a model, building it on first use"""
+    agent = _agents.get(model_id)
+    if agent is None:
+        def _build_llm():
+            llm_kwargs = {}
+            if os.getenv("BEDROCK_LATENCY_OPT"):
+                # Opt-in: not every model supports latency-optimized inference
+                llm_kwargs["performance_config"] = {"latency": "optimized"}
+
+            return ChatBedrockConverse(
+                model=f"us.{model_id}",
+                region_name=os.getenv("AWS_REGION", "us-east-1"),
+                temperature=0.3,
+                max_tokens=4096,
+                config=Config(
+                    retries={"mode": "adaptive"},
+                    tcp_keepalive=True,
+                    max_pool_connections=32,
+                ),
+                **llm_kwargs
+            )
 
-User: "What's due in my second course?"
-You: [Remember CS 559 from previous query]
-"For CS 559 (Machine Learning), you have:
-• HW3 - Due October 22, 2025 (not submitted)
-• Quiz 6 - Due October 19, 2025 (submitted)"
+        # boto3 client construction (imports, credential resolution) is
+        # independent of the MCP handshake, so run the two concurrently
+        llm_task = asyncio.create_task(asyncio.to_thread(_build_llm))
+        _, tools = await _get_mcp_session()
+        llm = await llm_task
 
-User: "How did I do on that quiz?"
-You: [Remember Quiz 6 from previous context]
-"You scored 10/10 on Quiz 6: Kernel Method. Great job!"
+        agent = create_react_agent(
+            llm,
+            tools,
+            checkpointer=MemorySaver(),
+            prompt=SYSTEM_PROMPT,
+            pre_model_hook=_trim_history
+        )
+        _agents[model_id] = agent
 
-═══════════════════════════════════════════════════════════════
+    return agent
 
-Be helpful, efficient, and natural. Students are busy - respect their time.
-"""
 
-        )
+@cl.on_chat_start
+async def on_chat_start():
+    """Initialize the chat session with Canvas MCP connection"""
+    
+    # One dataclass instead of a user-session entry per value
+    session_id = time.strftime("%Y%m%d_%H%M%S")
+    ctx = ChatCtx(
+        tracker=SessionTracker(_tracker, session_id=session_id),
+        session_id=session_id
+    )
+    cl.user_session.set("ctx", ctx)
+    
+    # Show loading message
+    msg = cl.Message(content="🔌 Connecting to Canvas...")
+    await msg.send()
+    
+    try:
+        # One shared agent per model; MemorySaver keys state on
+        # thread_id so sessions stay isolated
+        ctx.model_id = os.getenv("MODEL_ID", "meta.llama4-maverick-17b-instruct-v1:0")
+        ctx.agent = await _get_agent(ctx.model_id)
+        
+        # thread_id is stable for the chat, so build the agent config once
+        ctx.config = {
+            "configurable": {
+                "thread_id": cl.context.session.id
+            },
+            "recursion_limit": 50
+        }
         
-        # Store in user session
-        cl.user_session.set("agent", agent)
-        cl.user_session.set("model_id", model_id)
-        cl.user_session.set("mcp_session", session)
-        cl.user_session.set("stdio_context", stdio_context)
+        # Pre-warm the courses cache in the background so the likely
+        # first question answers from a warm TTL entry instead of
+        # paying Canvas latency after the user hits enter
+        session, _ = await _get_mcp_session()
+        prewarm = asyncio.create_task(session.call_tool("get_courses", {}))
+        _bg_tasks.add(prewarm)
+        prewarm.add_done_callback(_bg_tasks.discard)
+        prewarm.add_done_callback(lambda t: t.exception())
         
         # Update message
         msg.content = """✅ **Canvas Assistant Ready!**
@@ -218,7 +230,6 @@ I can help you with:
         await msg.update()
     
     except Exception as e:
-        import traceback
         error_details = traceback.format_exc()
         print(f"❌ Error in on_chat_start:\n{error_details}")
         msg.content = f"❌ **Connection Failed**\n\nError: {str(e)}"
@@ -228,117 +239,140 @@ I can help you with:
 async def on_message(message: cl.Message):
     """Process user messages with token tracking"""
     
-    agent = cl.user_session.get("agent")
-    tracker = cl.user_session.get("tracker")
-    model_id = cl.user_session.get("model_id")
-    session_id = cl.user_session.get("session_id")
+    ctx = cl.user_session.get("ctx")
     
-    if not agent:
+    if not ctx or not ctx.agent:
         await cl.Message(
             content="⚠️ Canvas connection not ready. Please refresh the page."
         ).send()
         return
     
-    # Track start time
-    start_time = time.time()
+    # Track start time (monotonic; immune to wall-clock jumps)
+    start_time = time.perf_counter()
     
-    # Show thinking indicator
-    thinking_msg = cl.Message(content="🤔 Thinking...")
-    await thinking_msg.send()
+    # Stream the response into a single message instead of the old
+    # thinking-placeholder send / remove / send dance; sent up front so
+    # it shows immediately and so update() works in the fallback and
+    # error branches (update is a no-op on a never-sent message)
+    response_msg = cl.Message(content="")
+    await response_msg.send()
+    streamed = False
     
     try:
-        # Configure agent with memory and limits
-        config = {
-            "configurable": {
-                "thread_id": cl.context.session.id
-            },
-            "recursion_limit": 50
-        }
+        # Run the agent, streaming model tokens as they arrive and
+        # capturing the final graph state for token accounting
+        complete_result = None
+        stream_token = response_msg.stream_token  # hoisted off the hot loop
         
-        # Run agent completely
-        complete_result = await agent.ainvoke(
+        # Coalesce streamed text into ~25ms batches: every stream_token
+        # await is a websocket send, and Bedrock chunk rates make
+        # per-chunk sends the bottleneck
+        pending = []
+        last_send = 0.0
+        async for event in ctx.agent.astream_events(
             {"messages": [("user", message.content)]},
-            config=config
-        )
+            config=ctx.config,
+            version="v2"
+        ):
+            kind = event["event"]
+            if kind == "on_chat_model_stream":
+                chunk = event["data"]["chunk"]
+                if chunk.tool_calls:
+                    continue
+                content = chunk.content
+                if isinstance(content, list):
+                    content = "".join(
+                        block["text"] for block in content
+                        if isinstance(block, dict) and block.get("type") == "text"
+                    )
+                if content:
+                    pending.append(content)
+                    streamed = True
+                    now = time.perf_counter()
+                    if now - last_send >= 0.025:
+                        await stream_token("".join(pending))
+                        pending.clear()
+                        last_send = now
+            elif kind == "on_chain_end" and event.get("name") == "LangGraph":
+                complete_result = event["data"]["output"]
+        
+        if pending:
+            await stream_token("".join(pending))
         
         # Calculate response time
-        response_time = time.time() - start_time
+        response_time = time.perf_counter() - start_time
         
-        # Get the final AI message - IMPROVED EXTRACTION
-        final_message = None
-        for msg in reversed(complete_result["messages"]):
-            if hasattr(msg, '__class__') and msg.__class__.__name__ == 'AIMessage':
-                # Skip messages with tool calls (intermediate steps)
-                if hasattr(msg, 'tool_calls') and msg.tool_calls:
-                    continue
-                
-                # Get the content
-                content = msg.content
-                
-                # Filter out JSON tool declarations
-                if isinstance(content, str):
-                    # Remove lines that look like tool calls
-                    lines = content.split('\n')
-                    cleaned_lines = [
-                        line for line in lines 
-                        if not (
-                            line.strip().startswith('{"name":') or
-                            line.strip().startswith('get_') or
-                            'function call' in line.lower() or
-                            'successful' in line.lower() and 'JSON' in line
-                        )
-                    ]
-                    final_message = '\n'.join(cleaned_lines).strip()
-                    
-                    if final_message:
-                        break
+        messages = complete_result["messages"] if complete_result else []
         
-        if not final_message:
-            final_message = "Sorry, I couldn't process that request."
-        
-        # Extract token usage
+        # Single forward pass: sum token usage, detect tool use, and
+        # remember the last non-tool AIMessage (the streaming fallback)
         total_input_tokens = 0
         total_output_tokens = 0
         tools_used = False
+        last_ai = None
         
-        for msg in complete_result["messages"]:
-            if hasattr(msg, 'usage_metadata') and msg.usage_metadata:
-                total_input_tokens += msg.usage_metadata.get("input_tokens", 0)
-                total_output_tokens += msg.usage_metadata.get("output_tokens", 0)
-            if hasattr(msg, 'tool_calls') and msg.tool_calls:
+        for msg in messages:
+            usage = getattr(msg, 'usage_metadata', None)
+            if usage:
+                total_input_tokens += usage.get("input_tokens", 0)
+                total_output_tokens += usage.get("output_tokens", 0)
+            if getattr(msg, 'tool_calls', None):
                 tools_used = True
+            elif isinstance(msg, AIMessage):
+                last_ai = msg
+        
+        final_message = None
+        if last_ai is not None and isinstance(last_ai.content, str):
+            final_message = last_ai.content.strip()
+        
+        if not final_message:
+            final_message = "Sorry, I couldn't process that request."
         
         # Log token usage
         cost_info = ""
-        if tracker and (total_input_tokens > 0 or total_output_tokens > 0):
-            log_entry = tracker.log_usage(
-                model_id=model_id,
+        if total_input_tokens > 0 or total_output_tokens > 0:
+            # Build the cost line from local math and log in the
+            # background so neither serialization nor a buffer flush
+            # delays the final message update
+            total_tokens = total_input_tokens + total_output_tokens
+            cost = ctx.tracker.estimate_cost(
+                ctx.model_id, total_input_tokens, total_output_tokens
+            )
+            
+            task = asyncio.create_task(asyncio.to_thread(
+                ctx.tracker.log_usage,
+                model_id=ctx.model_id,
                 input_tokens=total_input_tokens,
                 output_tokens=total_output_tokens,
                 query=message.content,
                 response_time=response_time,
                 tools_used=tools_used,
-                session_id=session_id
-            )
+                session_id=ctx.session_id
+            ))
+            _bg_tasks.add(task)
+            task.add_done_callback(_bg_tasks.discard)
             
-            cost_info = f"\n\n---\n💰 *Tokens: {log_entry['total_tokens']} | Cost: ${log_entry['estimated_cost_usd']:.6f} | Time: {log_entry['response_time_sec']}s*"
+            cost_info = f"\n\n---\n💰 *Tokens: {total_tokens} | Cost: ${cost:.6f} | Time: {round(response_time, 2)}s*"
         
-        # Remove thinking message and show final response
-        await thinking_msg.remove()
-        await cl.Message(content=final_message + cost_info).send()
+        # Finalize the streamed message in place
+        if streamed:
+            if cost_info:
+                await response_msg.stream_token(cost_info)
+        else:
+            response_msg.content = final_message + cost_info
+        await response_msg.update()
     
     except Exception as e:
-        await thinking_msg.remove()
-        await cl.Message(content=f"❌ Error: {str(e)}").send()
+        response_msg.content = f"❌ Error: {str(e)}"
+        await response_msg.update()
 
 
 
 @cl.on_chat_end
 async def on_chat_end():
-    """Clean up MCP connection and show cost summary"""
-    session = cl.user_session.get("mcp_session")
-    stdio_context = cl.user_session.get("stdio_context")
-    tracker = cl.user_session.get("tracker")
+    """Show the cost summary for the session"""
+    ctx = cl.user_session.get("ctx")
+    tracker = ctx.tracker if ctx else None
     
     # Show session summary
     if tracker:
@@ -352,8 +386,5 @@ Total cost: ${summary['total_cost_usd']:.4f}
 """
         ).send()
     
-    # Clean up connections
-    if session:
-        await session.__aexit__(None, None, None)
-    if stdio_context:
-        await stdio_context.__aexit__(None, None, None)
+    # The MCP session is shared across chats, so it is deliberately left
+    # open here and lives for the whole server process.
@@ -1,7 +1,9 @@
 # src/utils/token_tracker.py
 
-import json
-from datetime import datetime
+import atexit
+import orjson
+import threading
+import time
 from pathlib import Path
 from typing import Optional
 
@@ -23,10 +25,61 @@ class TokenTracker:
             "output": 0.00066
         },
     }
+
+    # Per-token rates derived once at class load so each log_usage call
+    # is two multiplies instead of dict indexing and division
+    _PER_TOKEN = {
+        model_id: (p["input"] / 1000.0, p["output"] / 1000.0)
+        for model_id, p in PRICING.items()
+    }
     
+    # Flush buffered log entries after this many records or seconds
+    FLUSH_EVERY = 32
+    FLUSH_INTERVAL = 5.0
+
     def __init__(self, log_file: str = "token_usage.jsonl"):
         self.log_file = Path(log_file)
         self.log_file.parent.mkdir(parents=True, exist_ok=True)
+        self._buf = []
+        self._last_flush = time.monotonic()
+        # One tracker is shared by every chat and log_usage runs on
+        # worker threads, so buffer and aggregate updates need a lock
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+        # Running aggregates so summaries are O(1) instead of re-reading
+        # the whole log; a sidecar checkpoint makes hydration O(new
+        # rows) rather than O(all rows) across process restarts
+        self._sidecar = self.log_file.with_suffix(".summary.json")
+        self._total_cost = 0.0
+        self._total_tokens = 0
+        self._queries = 0
+
+        offset = 0
+        log_size = self.log_file.stat().st_size if self.log_file.exists() else 0
+        if self._sidecar.exists():
+            try:
+                side = orjson.loads(self._sidecar.read_bytes())
+                # A truncated/rotated log invalidates the checkpoint
+                if 0 <= side["offset"] <= log_size:
+                    offset = side["offset"]
+                    self._total_cost = side["total_cost_usd"]
+                    self._total_tokens = side["total_tokens"]
+                    self._queries = side["total_queries"]
+            except (ValueError, KeyError, TypeError, OSError):
+                offset = 0
+
+        if log_size:
+            with open(self.log_file, "rb") as f:
+                f.seek(offset)
+                for line in f:
+                    entry = orjson.loads(line)
+                    self._total_cost += entry.get("estimated_cost_usd", 0)
+                    self._total_tokens += entry.get("total_tokens", 0)
+                    self._queries += 1
+                offset = f.tell()
+
+        self._write_sidecar(offset)
     
     def log_usage(
         self,
@@ -43,64 +96,146 @@ class TokenTracker:
         total_tokens = input_tokens + output_tokens
         
         # Calculate cost
-        pricing = self.PRICING.get(model_id, {"input": 0, "output": 0})
-        cost = (
-            (input_tokens / 1000) * pricing["input"] +
-            (output_tokens / 1000) * pricing["output"]
-        )
+        cost = self.estimate_cost(model_id, input_tokens, output_tokens)
         
-        # Create log entry
+        # Create log entry; time.strftime skips the datetime allocation
+        # and readers format the cost for display, so neither needs
+        # per-call rounding work
         entry = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
             "model_id": model_id,
             "input_tokens": input_tokens,
             "output_tokens": output_tokens,
             "total_tokens": total_tokens,
-            "estimated_cost_usd": round(cost, 6),
+            "estimated_cost_usd": cost,
             "query_preview": query[:100] if query else None,
             "response_time_sec": round(response_time, 2) if response_time else None,
             "tools_used": tools_used,
             "session_id": session_id
         }
         
-        # Append to JSONL file
-        with open(self.log_file, "a") as f:
-            f.write(json.dumps(entry) + "\n")
-        
+        with self._lock:
+            self._total_cost += entry["estimated_cost_usd"]
+            self._total_tokens += total_tokens
+            self._queries += 1
+
+            # Buffer the entry; flush on size/time threshold so we
+            # don't hit the disk on every query
+            self._buf.append(orjson.dumps(entry) + b"\n")
+            should_flush = (
+                len(self._buf) >= self.FLUSH_EVERY
+                or time.monotonic() - self._last_flush > self.FLUSH_INTERVAL
+            )
+
+        if should_flush:
+            self.flush()
+
         return entry
+
+    def estimate_cost(
+        self, model_id: str, input_tokens: int, output_tokens: int
+    ) -> float:
+        """Cost in USD for a token count, without logging anything"""
+        in_rate, out_rate = self._PER_TOKEN.get(model_id, (0.0, 0.0))
+        return input_tokens * in_rate + output_tokens * out_rate
+
+    def flush(self):
+        """Write any buffered log entries to disk"""
+        with self._lock:
+            if not self._buf:
+                return
+
+            with open(self.log_file, "ab") as f:
+                f.write(b"".join(self._buf))
+                offset = f.tell()
+
+            self._buf.clear()
+            self._last_flush = time.monotonic()
+            self._write_sidecar(offset)
+
+    def _write_sidecar(self, offset: int):
+        """Checkpoint the aggregates so the next startup skips old rows"""
+        try:
+            self._sidecar.write_bytes(orjson.dumps({
+                "offset": offset,
+                "total_cost_usd": self._total_cost,
+                "total_tokens": self._total_tokens,
+                "total_queries": self._queries,
+            }))
+        except OSError:
+            pass
     
     def get_total_cost(self) -> float:
         """Calculate total cost from all logged entries"""
-        if not self.log_file.exists():
-            return 0.0
-        
-        total = 0.0
-        with open(self.log_file, "r") as f:
-            for line in f:
-                entry = json.loads(line)
-                total += entry.get("estimated_cost_usd", 0)
-        
-        return round(total, 4)
+        return round(self._total_cost, 4)
     
     def get_summary(self) -> dict:
         """Get usage summary"""
-        if not self.log_file.exists():
-            return {"total_queries": 0, "total_cost": 0, "total_tokens": 0}
-        
-        total_cost = 0.0
-        total_tokens = 0
-        queries = 0
-        
-        with open(self.log_file, "r") as f:
-            for line in f:
-                entry = json.loads(line)
-                total_cost += entry.get("estimated_cost_usd", 0)
-                total_tokens += entry.get("total_tokens", 0)
-                queries += 1
+        if not self._queries:
+            return {
+                "total_queries": 0,
+                "total_tokens": 0,
+                "total_cost_usd": 0.0,
+                "avg_tokens_per_query": 0
+            }
         
         return {
-            "total_queries": queries,
-            "total_tokens": total_tokens,
-            "total_cost_usd": round(total_cost, 4),
-            "avg_tokens_per_query": round(total_tokens / queries) if queries > 0 else 0
+            "total_queries": self._queries,
+            "total_tokens": self._total_tokens,
+            "total_cost_usd": round(self._total_cost, 4),
+            "avg_tokens_per_query": round(self._total_tokens / self._queries)
+        }
+
+
+class SessionTracker:
+    """Per-session view over a shared TokenTracker
+
+    Forwards logging to the shared tracker (one log file, one pricing
+    table, one hydration pass per process) while keeping session-local
+    totals so the end-of-chat summary covers just this session.
+    """
+
+    def __init__(self, tracker: TokenTracker, session_id: Optional[str] = None):
+        self.tracker = tracker
+        self.session_id = session_id
+        self._total_cost = 0.0
+        self._total_tokens = 0
+        self._queries = 0
+
+    def log_usage(self, model_id: str, input_tokens: int, output_tokens: int, **kwargs):
+        """Log through the shared tracker and update session totals"""
+        kwargs.setdefault("session_id", self.session_id)
+        entry = self.tracker.log_usage(model_id, input_tokens, output_tokens, **kwargs)
+
+        self._total_cost += entry["estimated_cost_usd"]
+        self._total_tokens += entry["total_tokens"]
+        self._queries += 1
+
+        return entry
+
+    def estimate_cost(
+        self, model_id: str, input_tokens: int, output_tokens: int
+    ) -> float:
+        """Cost in USD for a token count, without logging anything"""
+        return self.tracker.estimate_cost(model_id, input_tokens, output_tokens)
+
+    def flush(self):
+        """Flush the shared tracker's buffer"""
+        self.tracker.flush()
+
+    def get_summary(self) -> dict:
+        """Get usage summary for this session only"""
+        if not self._queries:
+            return {
+                "total_queries": 0,
+                "total_tokens": 0,
+                "total_cost_usd": 0.0,
+                "avg_tokens_per_query": 0
+            }
+
+        return {
+            "total_queries": self._queries,
+            "total_tokens": self._total_tokens,
+            "total_cost_usd": round(self._total_cost, 4),
+            "avg_tokens_per_query": round(self._total_tokens / self._queries)
         }
@@ -0,0 +1,220 @@
+"""Verify what a Canvas access token can actually do.
+
+Run this before wiring a token into the MCP server to see which
+endpoints the token can reach:
+
+    uv run verify_token.py
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import orjson
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+load_dotenv()
+
+
+class CanvasTokenVerifier:
+    """Check a Canvas token against the endpoints the MCP server uses"""
+
+    # Every capability check as data: (emoji, name, endpoint template,
+    # needs_course). One dispatch loop replaces a printed block per
+    # endpoint and keeps error handling uniform.
+    TESTS = [
+        ("📝", "Assignments", "courses/{cid}/assignments", True),
+        ("📨", "Submissions", "courses/{cid}/students/submissions", True),
+        ("📢", "Announcements",
+         "announcements?context_codes[]=course_{cid}", True),
+        ("💬", "Discussions", "courses/{cid}/discussion_topics", True),
+        ("🗂️", "Modules", "courses/{cid}/modules", True),
+        ("📅", "Calendar", "calendar_events", False),
+        ("📁", "Files", "users/self/files", False),
+        ("🪪", "Profile", "users/self/profile", False),
+    ]
+
+    # Successful checks are remembered here between runs when
+    # CANVAS_VERIFY_CACHE=1, so debugging re-runs skip the network
+    CACHE_FILE = Path(".canvas_verify_cache.json")
+    CACHE_TTL = 3600
+
+    def __init__(self, base_url: str = None, access_token: str = None):
+        base_url = base_url or os.getenv("CANVAS_URL")
+        access_token = access_token or os.getenv("CANVAS_TOKEN")
+
+        if not base_url or not access_token:
+            raise ValueError("Canvas URL and access token are required")
+
+        self.base_url = base_url.rstrip('/')
+        # Explicit so compression survives any future header rewiring;
+        # requests only adds this by default when nothing clobbers it
+        self.headers = {
+            "Authorization": f"Bearer {access_token}",
+            "Accept-Encoding": "gzip, deflate",
+        }
+        self.test_results = []
+        self._courses = []
+        self._first_course_id = None
+
+        self._cache = {}
+        self._cache_enabled = bool(os.getenv("CANVAS_VERIFY_CACHE"))
+        if self._cache_enabled and self.CACHE_FILE.exists():
+            try:
+                self._cache = orjson.loads(self.CACHE_FILE.read_bytes())
+            except (ValueError, OSError):
+                self._cache = {}
+
+        # One session for the whole run: keep-alive reuses the TCP+TLS
+        # connection, so only the first check pays the handshake
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=10,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504],
+            ),
+        ))
+
+    def test_endpoint(self, name: str, url: str):
+        """
+        Hit one endpoint and report whether the token can use it
+
+        Args:
+            name: Human-readable capability name
+            url: Fully-formed URL (built once during table expansion)
+
+        Returns:
+            Tuple of (success, detail message)
+        """
+        cached_at = self._cache.get(url)
+        if cached_at is not None and time.time() - cached_at < self.CACHE_TTL:
+            return True, "OK (cached)"
+
+        try:
+            # stream=True: a passing check only needs the status line
+            response = self.session.get(url, timeout=10, stream=True)
+
+            try:
+                if response.status_code == 200:
+                    # Only successes are cached; failures always retry
+                    self._cache[url] = time.time()
+                    return True, "OK"
+
+                # Failures read (at most) a snippet of the body
+                return False, f"HTTP {response.status_code}: {response.text[:100]}"
+            finally:
+                response.close()
+
+        except requests.RequestException as e:
+            return False, str(e)
+
+    def _fetch_courses(self):
+        """Fetch the course list once, caching the parsed list and first id
+
+        Returns:
+            Tuple of (success, detail message) for the Courses check
+        """
+        try:
+            response = self.session.get(
+                f"{self.base_url}/api/v1/courses",
+                params={"enrollment_state": "active", "per_page": 1},
+                timeout=10
+            )
+        except requests.RequestException as e:
+            return False, str(e)
+
+        if response.status_code != 200:
+            return False, f"HTTP {response.status_code}: {response.text[:100]}"
+
+        self._courses = orjson.loads(response.content)
+        if self._courses:
+            self._first_course_id = self._courses[0]["id"]
+        return True, "OK"
+
+    def verify_all_capabilities(self):
+        """Run every endpoint check and print a capability report"""
+        print("🔑 Verifying Canvas token...")
+        print(f"   {self.base_url}\n")
+
+        # Phase 1: one courses fetch serves both the Courses check and
+        # the course id every course-level check hangs off
+        courses_ok, courses_detail = self._fetch_courses()
+        course_id = self._first_course_id
+
+        print(f"📚 Courses: {'✅' if courses_ok else '❌'} {courses_detail}")
+        self.test_results.append(("Courses", courses_ok))
+
+        # Phase 2: expand the table, skipping course-level rows when
+        # there is no course, then run the independent checks
+        # concurrently; wall time becomes the slowest round-trip
+        # instead of the sum of all of them
+        # URLs are built exactly once here; per_page=1 keeps list
+        # endpoints from assembling pages the checks never read (object
+        # endpoints ignore it)
+        api_base = f"{self.base_url}/api/v1/"
+        checks = []
+        skipped = []
+        for emoji, name, template, needs_course in self.TESTS:
+            if needs_course and course_id is None:
+                skipped.append(name)
+            else:
+                endpoint = template.format(cid=course_id)
+                sep = "&" if "?" in endpoint else "?"
+                checks.append((emoji, name, f"{api_base}{endpoint}{sep}per_page=1"))
+
+        with ThreadPoolExecutor(max_workers=len(checks)) as pool:
+            outcomes = list(pool.map(
+                lambda check: self.test_endpoint(check[1], check[2]),
+                checks
+            ))
+
+        for (emoji, name, _), (success, detail) in zip(checks, outcomes):
+            status = "✅" if success else "❌"
+            print(f"{emoji} {name}: {status} {detail}")
+            self.test_results.append((name, success))
+            if name == "Profile":
+                # users/self/profile proves the token authenticates, so
+                # one GET answers both capabilities
+                print(f"👤 Authentication: {status} {detail}")
+                self.test_results.append(("Authentication", success))
+
+        if skipped:
+            print("⚠️  No courses found - skipping course-level checks")
+            for name in skipped:
+                self.test_results.append((name, False))
+
+        # Verdict
+        passed = sum(1 for _, success in self.test_results if success)
+        total = len(self.test_results)
+
+        print(f"\n{passed}/{total} capabilities available")
+        if passed == total:
+            print("✅ Token has FULL access")
+        elif passed > 0:
+            print("⚠️  Token has PARTIAL access")
+        else:
+            print("❌ Token is BLOCKED - check CANVAS_TOKEN")
+
+        if self._cache_enabled:
+            self.CACHE_FILE.write_bytes(orjson.dumps(self._cache))
+
+        self.session.close()
+        return self.test_results
+
+    def clear_cache(self):
+        """Drop the on-disk cache so every check hits the network again"""
+        self._cache = {}
+        self.CACHE_FILE.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    verifier = CanvasTokenVerifier()
+    verifier.verify_all_capabilities()